@@ -24,7 +24,8 @@ class FirstStreet:
 
         Attributes:
             api_key (str): A string specifying the API key.
-            connection_limit (int): max number of connections to make
+            connection_limit (int/None): max number of connections to make. If None, it is set automatically from the
+                rate limit and the measured round trip time
             rate_limit (int): max number of requests during the period
             rate_period (int): period of time for the limit
             version (str): The version to call the API with
@@ -55,6 +55,7 @@ if __name__ == "__main__":
                                         'probability.get_count_summary',
                                         'probability.get_cumulative',
                                         'probability.get_count',
+                                        'probability.get_all',
                                         'historic.get_event',
                                         'historic.get_summary',
                                         'historic.get_events_by_location',
@@ -269,6 +270,13 @@ if __name__ == "__main__":
                                              output_dir=argument.output_dir,
                                              extra_param=formatted_params)
 
+                elif argument.product == 'probability.get_all':
+                    fs.probability.get_all(search_items,
+                                           argument.location_type or "property",
+                                           csv=True,
+                                           output_dir=argument.output_dir,
+                                           extra_param=formatted_params)
+
                 elif argument.product == 'historic.get_event':
                     fs.historic.get_event(search_items,
                                           csv=True,
@@ -398,6 +406,10 @@ if __name__ == "__main__":
                     logging.error("Product not found. Please check that the argument"
                                   " provided is correct: {}".format(argument.product))
 
+                # Wait for the csvs still being written in the background
+                fs.adaptation.flush()
+                fs.probability.flush()
+
             finally:
                 input("Press Enter to continue...")
 
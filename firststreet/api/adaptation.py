@@ -3,12 +3,23 @@
 
 # Standard Imports
 import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 
 # Internal Imports
 from firststreet.api import csv_format
 from firststreet.api.api import Api
 from firststreet.errors import InvalidArgument
 from firststreet.models.adaptation import AdaptationDetail, AdaptationSummary
+from firststreet.util import ResponseCache
+
+# The max number of adaptation details and summaries cached, and the number of seconds each is cached for
+DETAIL_CACHE_SIZE = 100000
+DETAIL_CACHE_TTL = 3600
+SUMMARY_CACHE_SIZE = 8192
+SUMMARY_CACHE_TTL = 3600
+
+_logger = logging.getLogger(__name__)
 
 
 class Adaptation(Api):
@@ -17,9 +28,41 @@ class Adaptation(Api):
         Methods:
             get_detail: Retrieves a list of Adaptation Details for the given list of IDs
             get_summary: Retrieves a list of Adaptation Summary for the given list of IDs
+            clear_cache: Removes every cached Adaptation Detail and Adaptation Summary
+            _get_process_pool: Returns the process pool that writes the split csvs
+            _get_details: Retrieves the Adaptation Detail responses, calling the API only for those not cached
+            _cache_details: Caches the valid Adaptation Detail responses
+            _cache_summaries: Caches the valid Adaptation Summary responses
+        """
+
+    # Writes the split csvs. Created on first use, as starting the processes is slow, and shared by every instance
+    _process_pool = None
+
+    def __init__(self, http):
+        """ Init"""
+        super().__init__(http)
+        self._detail_cache = ResponseCache(DETAIL_CACHE_SIZE, DETAIL_CACHE_TTL)
+        self._summary_cache = ResponseCache(SUMMARY_CACHE_SIZE, SUMMARY_CACHE_TTL)
+
+    @classmethod
+    def _get_process_pool(cls):
+        """Returns the process pool shared by every instance, creating it on first use
+
+        Returns:
+            A ProcessPoolExecutor
         """
+        # Spawn rather than fork, as forking while the csv threads hold locks can deadlock the child processes
+        if cls._process_pool is None:
+            cls._process_pool = ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context("spawn"))
 
-    def get_detail(self, search_items, csv=False, output_dir=None, extra_param=None):
+        return cls._process_pool
+
+    def clear_cache(self):
+        """Removes every cached adaptation detail and summary, so the next calls retrieve them from the API"""
+        self._detail_cache.clear()
+        self._summary_cache.clear()
+
+    def get_detail(self, search_items, csv=False, output_dir=None, extra_param=None, vectorized=False, stream=False):
         """Retrieves adaptation detail product data from the First Street Foundation API given a list of search_items
          and returns a list of Adaptation Detail objects.
 
@@ -29,22 +72,34 @@ class Adaptation(Api):
             csv (bool): To output extracted data to a csv or not
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            vectorized (bool): To return a Product Batch backed by a DataFrame instead of a list
+            stream (bool): To call the API in chunks. Writes each chunk to the csv and returns None if csv, otherwise
+                returns an iterator of the objects. Cannot be combined with vectorized
 
         Returns:
             A list of Adaptation Detail
         """
+        if stream:
+            return self._stream(search_items, "adaptation", "detail", None, AdaptationDetail, csv=csv,
+                                output_dir=output_dir, extra_param=extra_param, vectorized=vectorized,
+                                fetch_chunk=lambda chunk: self._get_details(chunk, extra_param=extra_param))
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "adaptation", "detail", None, extra_param=extra_param)
-        product = [AdaptationDetail(api_data) for api_data in api_datas]
+        api_datas = self._get_details(search_items, extra_param=extra_param)
+        if vectorized:
+            product = AdaptationDetail.from_records(api_datas)
+        else:
+            product = list(map(AdaptationDetail, api_datas))
 
         if csv:
-            csv_format.to_csv(product, "adaptation", "detail", output_dir=output_dir)
+            self._to_csv(self._snapshot(product), "adaptation", "detail", output_dir=output_dir)
 
-        logging.info("Adaptation Detail Data Ready.")
+        _logger.info("Adaptation Detail Data Ready.")
 
         return product
 
-    def get_detail_by_location(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    def get_detail_by_location(self, search_items, location_type, csv=False, output_dir=None, extra_param=None,
+                               split_csv=False):
         """Retrieves adaptation detail product data from the First Street Foundation API given a list of location
         search_items and returns a list of Adaptation Detail objects.
 
@@ -55,43 +110,126 @@ class Adaptation(Api):
             csv (bool): To output extracted data to a csv or not
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            split_csv (bool): To output the summary and detail to separate csvs, written in parallel processes, instead
+                of a single merged csv. Requires csv. Like csv, the csvs are written in the background until flush is
+                called. The processes are spawned, so the calling script must be guarded by if __name__ == "__main__"
 
         Returns:
             A list of list of Adaptation Summary and Adaptation Detail
         Raises:
-            InvalidArgument: The location provided is empty
+            InvalidArgument: The location provided is empty, no search items are provided, or split_csv is given
+                without csv
             TypeError: The location provided is not a string
         """
 
-        if not location_type:
-            raise InvalidArgument(location_type)
-        elif not isinstance(location_type, str):
-            raise TypeError("location is not a string")
+        self._validate_location(location_type)
 
-        # Get data from api and create objects
-        api_datas_summary = self.call_api(search_items, "adaptation", "summary", location_type, extra_param=extra_param)
-        summary = [AdaptationSummary(api_data) for api_data in api_datas_summary]
+        if split_csv and not csv:
+            raise InvalidArgument("split_csv requires csv to be True")
+
+        if not isinstance(search_items, list):
+            search_items = self._read_search_items(search_items)
 
-        search_items = list(set([adaptation for sum_adap in summary if sum_adap.adaptation for
-                                 adaptation in sum_adap.adaptation]))
+        # No items found
+        if not search_items:
+            raise InvalidArgument(search_items)
 
-        if search_items:
-            api_datas_detail = self.call_api(search_items, "adaptation", "detail", None, extra_param=extra_param)
+        # Responses are not cached when extra parameters change them
+        use_cache = not extra_param and all(isinstance(item, (int, str, tuple)) for item in search_items)
 
+        # Adaptation IDs already requested, in the order they were found, with their cached detail (if any)
+        seen = {}
+
+        def new_adaptations(api_data):
+            """Returns the adaptations of a summary that are not requested or cached yet"""
+            adaptations = []
+            for adaptation in api_data.get("adaptation") or ():
+                if adaptation not in seen:
+                    seen[adaptation] = self._detail_cache.get(adaptation) if use_cache else None
+                    if seen[adaptation] is None:
+                        adaptations.append(adaptation)
+
+            return adaptations
+
+        def follow_up(api_data):
+            """Creates the detail endpoints for the adaptations of a summary that are not requested or cached yet"""
+            adaptations = new_adaptations(api_data)
+            if not adaptations:
+                return []
+
+            return self._create_endpoints(adaptations, "adaptation", "detail", None, extra_param=extra_param)
+
+        # Only the summaries that are not cached are called from the API
+        if use_cache:
+            api_datas_summary = {item: self._summary_cache.get((location_type, item)) for item in search_items}
+            misses = [item for item, api_data in api_datas_summary.items() if api_data is None]
         else:
+            api_datas_summary = {}
+            misses = search_items
+
+        # The details of the cached summaries are requested straight away
+        adaptations = [adaptation for api_data in api_datas_summary.values() if api_data is not None
+                       for adaptation in new_adaptations(api_data)]
+
+        # Get data from api and create objects. The details are requested as soon as each summary arrives
+        if misses:
+            follow_endpoints = self._create_endpoints(adaptations, "adaptation", "detail", None) if adaptations else []
+            api_datas_misses, api_datas_detail = self.call_api_chained(misses, "adaptation", "summary",
+                                                                       location_type, follow_up,
+                                                                       extra_param=extra_param,
+                                                                       follow_endpoints=follow_endpoints)
+        elif adaptations:
+            api_datas_misses, api_datas_detail = [], self.call_api(adaptations, "adaptation", "detail", None)
+
+        else:
+            api_datas_misses, api_datas_detail = [], []
+
+        if use_cache:
+            self._cache_summaries(location_type, misses, api_datas_misses)
+            api_datas_summary.update(zip(misses, api_datas_misses))
+            api_datas_summary = [api_datas_summary[item] for item in search_items]
+
+        else:
+            api_datas_summary = api_datas_misses
+
+        summary = list(map(AdaptationSummary, api_datas_summary))
+
+        if not seen:
             api_datas_detail = [{"adaptationId": None, "valid_id": False}]
 
-        detail = [AdaptationDetail(api_data) for api_data in api_datas_detail]
+        else:
+            if use_cache:
+                self._cache_details(api_datas_detail)
 
-        if csv:
-            csv_format.to_csv([summary, detail], "adaptation", "summary_detail", location_type,
-                              output_dir=output_dir)
+            # The follow up responses are in the order the uncached adaptations were found
+            fetched = iter(api_datas_detail)
+            details = {adaptation: api_data if api_data is not None else next(fetched)
+                       for adaptation, api_data in seen.items()}
+
+            # The adaptations were found in network order, so the details follow the order of the summaries instead
+            api_datas_detail = [details[adaptation] for adaptation in
+                                dict.fromkeys(adaptation for api_data in api_datas_summary
+                                              for adaptation in api_data.get("adaptation") or ())]
+
+        detail = list(map(AdaptationDetail, api_datas_detail))
+
+        if csv and split_csv:
+            pool = self._get_process_pool()
+            self._track_write(pool.submit(csv_format.to_csv, list(summary), "adaptation", "summary", location_type,
+                                          output_dir=output_dir))
+            self._track_write(pool.submit(csv_format.to_csv, list(detail), "adaptation", "detail", location_type,
+                                          output_dir=output_dir))
 
-        logging.info("Adaptation Summary Detail Data Ready.")
+        elif csv:
+            self._to_csv([list(summary), list(detail)], "adaptation", "summary_detail", location_type,
+                         output_dir=output_dir)
+
+        _logger.info("Adaptation Summary Detail Data Ready.")
 
         return [summary, detail]
 
-    def get_summary(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    def get_summary(self, search_items, location_type, csv=False, output_dir=None, extra_param=None,
+                    vectorized=False, stream=False):
         """Retrieves adaptation summary product data from the First Street Foundation API given a list of
         search_items and returns a list of Adaptation Summary objects.
 
@@ -102,6 +240,9 @@ class Adaptation(Api):
             csv (bool): To output extracted data to a csv or not
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            vectorized (bool): To return a Product Batch backed by a DataFrame instead of a list
+            stream (bool): To call the API in chunks. Writes each chunk to the csv and returns None if csv, otherwise
+                returns an iterator of the objects. Cannot be combined with vectorized
 
         Returns:
             A list of Adaptation Summary
@@ -110,18 +251,77 @@ class Adaptation(Api):
             TypeError: The location provided is not a string
         """
 
-        if not location_type:
-            raise InvalidArgument(location_type)
-        elif not isinstance(location_type, str):
-            raise TypeError("location is not a string")
+        self._validate_location(location_type)
+
+        if stream:
+            return self._stream(search_items, "adaptation", "summary", location_type, AdaptationSummary, csv=csv,
+                                csv_location_type=location_type, output_dir=output_dir, extra_param=extra_param,
+                                vectorized=vectorized)
 
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "adaptation", "summary", location_type, extra_param=extra_param)
-        product = [AdaptationSummary(api_data) for api_data in api_datas]
+        if vectorized:
+            api_datas = self.call_api(search_items, "adaptation", "summary", location_type, extra_param=extra_param)
+            product = AdaptationSummary.from_records(api_datas)
+        else:
+            product = self.call_api(search_items, "adaptation", "summary", location_type, extra_param=extra_param,
+                                    row_factory=AdaptationSummary)
 
         if csv:
-            csv_format.to_csv(product, "adaptation", "summary", location_type, output_dir=output_dir)
+            self._to_csv(self._snapshot(product), "adaptation", "summary", location_type, output_dir=output_dir)
 
-        logging.info("Adaptation Summary Data Ready.")
+        _logger.info("Adaptation Summary Data Ready.")
 
         return product
+
+    def _get_details(self, search_items, extra_param=None):
+        """Retrieves the adaptation detail responses for the given adaptation ids. Only the ids that are not cached are
+        called from the API, and the valid responses are cached for the next calls.
+
+        Args:
+            search_items (list/file): A list or file of Adaptation IDs
+            extra_param (dict): Extra parameter to be added to the url. Responses are not cached when given
+
+        Returns:
+            A list of Adaptation Detail responses in the order of the search items
+        """
+
+        if not isinstance(search_items, list):
+            search_items = self._read_search_items(search_items)
+
+        # Invalid search items are raised by the API call
+        if extra_param or not search_items or not all(isinstance(item, int) for item in search_items):
+            return self.call_api(search_items, "adaptation", "detail", None, extra_param=extra_param)
+
+        api_datas = {item: self._detail_cache.get(item) for item in search_items}
+        misses = [item for item, api_data in api_datas.items() if api_data is None]
+
+        if misses:
+            api_datas_misses = self.call_api(misses, "adaptation", "detail", None)
+            self._cache_details(api_datas_misses)
+            api_datas.update(zip(misses, api_datas_misses))
+
+        return [api_datas[item] for item in search_items]
+
+    def _cache_details(self, api_datas):
+        """Caches the valid adaptation detail responses by their adaptation id
+
+        Args:
+            api_datas (list): A list of Adaptation Detail responses
+        """
+
+        for api_data in api_datas:
+            if api_data.get("adaptationId") is not None and api_data.get("valid_id", True):
+                self._detail_cache.set(api_data["adaptationId"], api_data)
+
+    def _cache_summaries(self, location_type, search_items, api_datas):
+        """Caches the valid adaptation summary responses by their location type and search item
+
+        Args:
+            location_type (str): The location lookup type
+            search_items (list): A list of the search items of the responses
+            api_datas (list): A list of Adaptation Summary responses
+        """
+
+        for search_item, api_data in zip(search_items, api_datas):
+            if "search_item" not in api_data and api_data.get("valid_id", True):
+                self._summary_cache.set((location_type, search_item), api_data)
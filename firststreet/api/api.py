@@ -3,14 +3,24 @@
 
 # Standard Imports
 import asyncio
+import itertools
+import logging
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, wait
 
 # Internal Imports
 import os
 
+from firststreet.api import csv_format
 from firststreet.errors import InvalidArgument
+from firststreet.models.api import ProductBatch
 from firststreet.util import read_search_items_from_file
 
+# The number of search items called at a time when streaming a product
+STREAM_CHUNK_SIZE = 1000
+
+_logger = logging.getLogger(__name__)
+
 
 class Api:
     """This class handles the calls to the API through the http class
@@ -19,14 +29,92 @@ class Api:
             http (Http): A http class to connect to the First Street Foundation API
         Methods:
             call_api: Creates an endpoint
+            call_api_chained: Creates an endpoint and chains follow up calls onto each response
+            call_api_batch: Creates the endpoints of several products and calls them together
+            flush: Waits for the csvs still being written in the background
+            _stream: Calls the API in chunks, writing each chunk to the csv or yielding its objects
+            _to_csv: Writes a csv in the background
+            _snapshot: Copies the products to be written to a csv in the background
+            _track_write: Keeps a csv write until it is flushed, dropping the writes that succeeded
+            _validate_location: Checks the location type provided to a product
         """
 
+    # Products that are searched by EventIDs, AdaptationIDs or ProviderIDs instead of locations
+    _ID_PRODUCTS = frozenset([("adaptation", "detail"), ("historic", "event"), ("economic/avm", "provider")])
+
+    # Shared by every product so csv writes overlap with the following API calls
+    _csv_pool = ThreadPoolExecutor(max_workers=2)
+
     def __init__(self, http):
         """ Init"""
         self._http = http
+        self._pending_writes = []
+
+    def flush(self):
+        """Waits for every csv submitted by this product to finish writing. The products passed to the csv should not
+        be modified until then.
+
+        Raises:
+            The first error raised while writing a csv
+        """
+        pending, self._pending_writes = self._pending_writes, []
+        wait(pending)
+        for future in pending:
+            future.result()
+
+    def _to_csv(self, data, product, product_subtype, location_type=None, output_dir=None):
+        """Submits the data to be written to a csv on a background thread. See csv_format.to_csv. The data must not be
+        modified until the csv is written, so the callers pass a copy made by _snapshot
+
+        Args:
+            data (list): A list of FSF object
+            product (str): The overall product to call
+            product_subtype (str): The product subtype (if suitable)
+            location_type (str): The location lookup type (if suitable)
+            output_dir (str): The output directory to save the generated csvs
+        """
+        self._track_write(self._csv_pool.submit(csv_format.to_csv, data, product, product_subtype,
+                                                location_type=location_type, output_dir=output_dir))
+
+    @staticmethod
+    def _snapshot(products):
+        """Copies the products to be written to a csv in the background, so the caller can modify the returned products.
+        A Product Batch is copied from its responses, so its objects are created on the writer thread and not kept
+
+        Args:
+            products (list/ProductBatch): A list of FSF object or a Product Batch
+        Returns:
+            A list of FSF object or a Product Batch
+        """
+        if isinstance(products, ProductBatch):
+            return ProductBatch(products.responses, products.model)
+
+        return list(products)
+
+    def _track_write(self, future):
+        """Keeps a csv write until it is flushed. The writes that finished without an error are dropped, while the
+        failed writes are kept so flush raises their error
+
+        Args:
+            future (Future): The future of the csv write
+        """
+        self._pending_writes = [write for write in self._pending_writes
+                                if not write.done() or write.cancelled() or write.exception() is not None]
+        self._pending_writes.append(future)
+        future.add_done_callback(self._log_write_error)
+
+    @staticmethod
+    def _log_write_error(future):
+        """Logs the error of a csv write as soon as it fails
+
+        Args:
+            future (Future): The future of the csv write
+        """
+        if not future.cancelled() and future.exception() is not None:
+            _logger.error("Failed to write the csv: {}".format(future.exception()))
 
     def call_api(self, search_item, product, product_subtype, location=None, tile_product=None, year=None,
-                 return_period=None, event_id=None, extra_param=None):
+                 return_period=None, event_id=None, extra_param=None, row_factory=None):
         """Receives an item, a product, a product subtype, and a location to create and call an endpoint to the First
         Street Foundation API.
 
@@ -41,22 +129,195 @@ class Api:
             return_period (int/None): The return period for probability depth tiles (if suitable)
             event_id (int/None): The event_id for historic tiles (if suitable)
             extra_param (dict): Extra parameter to be added to the url
+            row_factory (callable): Creates an object from each JSON response as soon as it is read (if suitable)
         Returns:
-            A list of JSON responses
+            A list of JSON responses, or a list of the objects created by row_factory
         """
 
-        # Not a list. This means it's should be a file
+        endpoints = self._create_endpoints(search_item, product, product_subtype, location=location,
+                                           tile_product=tile_product, year=year, return_period=return_period,
+                                           event_id=event_id, extra_param=extra_param)
+
+        # Asynchronously call the API for each endpoint
+        loop = asyncio.get_event_loop()
+        response = loop.run_until_complete(self._http.endpoint_execute(endpoints, row_factory=row_factory))
+
+        if product == "economic/aal":
+            return zip(response, [endpoint[1] for endpoint in endpoints])
+
+        return response
+
+    def call_api_chained(self, search_item, product, product_subtype, location, follow_up, extra_param=None,
+                         follow_endpoints=None):
+        """Receives an item, a product, a product subtype, and a location to create and call an endpoint to the First
+        Street Foundation API. Each response is handed to follow_up as soon as it arrives, and the endpoints it returns
+        are called in the same session without waiting for the remaining responses.
+
+        Args:
+            search_item (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+                file of First Street Foundation IDs
+            product (str): The overall product to call
+            product_subtype (str): The product subtype (if suitable)
+            location (str/None): The location type (if suitable)
+            follow_up (callable): Receives a JSON response and returns a list of endpoints to call next
+            extra_param (dict): Extra parameter to be added to the url
+            follow_endpoints (list): Follow up endpoints to call straight away, before any response arrives
+        Returns:
+            A list of JSON responses and a list of the follow up JSON responses
+        """
+
+        endpoints = self._create_endpoints(search_item, product, product_subtype, location=location,
+                                           extra_param=extra_param)
+
+        # Asynchronously call the API for each endpoint and its follow ups
+        loop = asyncio.get_event_loop()
+        return loop.run_until_complete(self._http.endpoint_execute(endpoints, follow_up=follow_up,
+                                                                   follow_endpoints=follow_endpoints))
+
+    def _stream(self, search_item, product, product_subtype, location, row_factory, csv=False,
+                csv_location_type=None, output_dir=None, extra_param=None, chunk_size=None, vectorized=False,
+                fetch_chunk=None):
+        """Calls the API for the search items in chunks of chunk_size, holding only one chunk at a time. If csv, every
+        chunk is called and appended to the csv before returning. Otherwise, returns an iterator of the objects created
+        by row_factory, and the API is only called as the iterator is consumed.
+
+        Args:
+            search_item (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+                file of First Street Foundation IDs
+            product (str): The overall product to call
+            product_subtype (str): The product subtype (if suitable)
+            location (str/None): The location type (if suitable)
+            row_factory (callable): Creates an object from each JSON response
+            csv (bool): To output extracted data to a csv or not
+            csv_location_type (str/None): The location lookup type of the csv (if suitable)
+            output_dir (str): The output directory to save the generated csvs
+            extra_param (dict): Extra parameter to be added to the url
+            chunk_size (int): The number of search items to call the API with at a time. Defaults to STREAM_CHUNK_SIZE
+            vectorized (bool): If the caller asked for a Product Batch, which cannot be streamed
+            fetch_chunk (callable): Returns the JSON responses for a chunk of search items, in place of calling the API
+                directly (if suitable)
+        Returns:
+            None if csv, otherwise an iterator of the objects created by row_factory
+        Raises:
+            InvalidArgument: No search items are provided, or vectorized is given
+        """
+
+        if vectorized:
+            raise InvalidArgument("stream cannot be combined with vectorized")
+
         if not isinstance(search_item, list):
+            search_item = self._read_search_items(search_item)
 
-            # Check if it's a file
-            if isinstance(search_item, str) and os.path.isfile(search_item):
+        # No items found
+        if not search_item:
+            raise InvalidArgument(search_item)
 
-                # Get search items from file
-                search_item = read_search_items_from_file(search_item)
+        if chunk_size is None:
+            chunk_size = STREAM_CHUNK_SIZE
 
-            else:
-                raise InvalidArgument("File provided is not a list or a valid file. "
-                                      "Please check the file name and path. '{}'".format(str(search_item)))
+        if fetch_chunk:
+            chunks = (list(map(row_factory, fetch_chunk(search_item[i:i + chunk_size])))
+                      for i in range(0, len(search_item), chunk_size))
+        else:
+            chunks = (self.call_api(search_item[i:i + chunk_size], product, product_subtype, location,
+                                    extra_param=extra_param, row_factory=row_factory)
+                      for i in range(0, len(search_item), chunk_size))
+
+        # Write every chunk now, so the csv does not depend on the caller consuming anything
+        if csv:
+            for _ in csv_format.to_csv_chunks(chunks, product, product_subtype, csv_location_type,
+                                              output_dir=output_dir):
+                pass
+
+            return None
+
+        return itertools.chain.from_iterable(chunks)
+
+    @staticmethod
+    def _read_search_items(search_item):
+        """Reads the search items from the given file
+
+        Args:
+            search_item (file): A file of First Street Foundation IDs, lat/lng pair, or address
+        Returns:
+            A list of search_items
+        Raises:
+            InvalidArgument: The file is not a valid file
+        """
+
+        # Check if it's a file
+        if isinstance(search_item, str) and os.path.isfile(search_item):
+
+            # Get search items from file
+            return read_search_items_from_file(search_item)
+
+        raise InvalidArgument("File provided is not a list or a valid file. "
+                              "Please check the file name and path. '{}'".format(str(search_item)))
+
+    @staticmethod
+    def _validate_location(location_type):
+        """Checks that the location type is a non-empty string
+
+        Args:
+            location_type (str): The location lookup type
+        Raises:
+            InvalidArgument: The location provided is empty
+            TypeError: The location provided is not a string
+        """
+        if not location_type:
+            raise InvalidArgument(location_type)
+        elif not isinstance(location_type, str):
+            raise TypeError("location is not a string")
+
+    def call_api_batch(self, search_item, products, extra_param=None):
+        """Receives an item and a list of products to create and call the endpoints of every product to the First
+        Street Foundation API in a single batch, sharing the same session.
+
+        Args:
+            search_item (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+                file of First Street Foundation IDs
+            products (list): A list of tuples of (product, product subtype, location type)
+            extra_param (dict): Extra parameter to be added to the url
+        Returns:
+            A list of the list of JSON responses for each product
+        """
+
+        if not isinstance(search_item, list):
+            search_item = self._read_search_items(search_item)
+
+        endpoints = [self._create_endpoints(search_item, product, product_subtype, location, extra_param=extra_param)
+                     for product, product_subtype, location in products]
+
+        # Asynchronously call the API for the endpoints of every product
+        loop = asyncio.get_event_loop()
+        response = loop.run_until_complete(self._http.endpoint_execute(list(itertools.chain.from_iterable(endpoints))))
+
+        # Split the responses back by product
+        response = iter(response)
+        return [list(itertools.islice(response, len(product_endpoints))) for product_endpoints in endpoints]
+
+    def _create_endpoints(self, search_item, product, product_subtype, location=None, tile_product=None, year=None,
+                          return_period=None, event_id=None, extra_param=None):
+        """Validates the search items and creates the endpoints to the First Street Foundation API.
+
+        Args:
+            search_item (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+                file of First Street Foundation IDs
+            product (str): The overall product to call
+            product_subtype (str): The product subtype (if suitable)
+            location (str/None): The location type (if suitable)
+            tile_product (str/None): The tile product (if suitable)
+            year (int/None): The year for probability depth tiles (if suitable)
+            return_period (int/None): The return period for probability depth tiles (if suitable)
+            event_id (int/None): The event_id for historic tiles (if suitable)
+            extra_param (dict): Extra parameter to be added to the url
+        Returns:
+            A list of endpoint tuples of (url, search item, product, product subtype)
+        """
+
+        # Not a list. This means it's should be a file
+        if not isinstance(search_item, list):
+            search_item = self._read_search_items(search_item)
 
         else:
 
@@ -76,10 +337,7 @@ class Api:
             # else:
 
         # Ensure for historic and adaptation the search items are EventIDs or AdaptationIDs
-        if ((product == "adaptation" and product_subtype == "detail") or
-            (product == "historic" and product_subtype == "event") or
-            (product == "economic/avm" and product_subtype == "provider")) and \
-                not all(isinstance(t, int) for t in search_item):
+        if (product, product_subtype) in self._ID_PRODUCTS and not all(isinstance(t, int) for t in search_item):
             raise TypeError("Input must be an integer for this product. "
                             "Provided Arg: {}".format(search_item))
 
@@ -90,47 +348,44 @@ class Api:
         base_url = self._http.options.get('url')
         version = self._http.version
 
+        # Create the part of the endpoint shared by every search item
+        if location:
+            base_endpoint = "/".join([base_url, version, product, product_subtype, location])
+        elif tile_product:
+            if event_id:
+                base_endpoint = "/".join([base_url, version, product, product_subtype, tile_product, str(event_id)])
+            else:
+                base_endpoint = "/".join([base_url, version, product, product_subtype, tile_product,
+                                          str(year), str(return_period)])
+        else:
+            base_endpoint = "/".join([base_url, version, product, product_subtype])
+
+        if not extra_param:
+            formatted_params = ""
+        else:
+            formatted_params = urllib.parse.urlencode(extra_param)
+
         # Create the endpoint
         endpoints = []
         for item in search_item:
-            if location:
-                endpoint = "/".join([base_url, version, product, product_subtype, location])
-            elif tile_product:
-                if event_id:
-                    endpoint = "/".join([base_url, version, product, product_subtype, tile_product,
-                                         str(event_id), "/".join(map(str, item))])
-                else:
-                    endpoint = "/".join([base_url, version, product, product_subtype, tile_product,
-                                         str(year), str(return_period), "/".join(map(str, item))])
-            else:
-                endpoint = "/".join([base_url, version, product, product_subtype])
+            endpoint = base_endpoint
 
-            if not tile_product:
-
-                if not extra_param:
-                    formatted_params = ""
-                else:
-                    formatted_params = urllib.parse.urlencode(extra_param)
+            if tile_product:
+                if not location:
+                    endpoint = endpoint + "/" + "/".join(map(str, item))
 
-                # fsid
-                if isinstance(item, int):
-                    endpoint = endpoint + "/{}".format(item) + "?{}".format(formatted_params)
+            # fsid
+            elif isinstance(item, int):
+                endpoint = endpoint + "/{}".format(item) + "?{}".format(formatted_params)
 
-                # lat/lng
-                elif isinstance(item, tuple):
-                    endpoint = endpoint + "?lat={}&lng={}&{}".format(item[0], item[1], formatted_params)
+            # lat/lng
+            elif isinstance(item, tuple):
+                endpoint = endpoint + "?lat={}&lng={}&{}".format(item[0], item[1], formatted_params)
 
-                # address
-                elif isinstance(item, str):
-                    endpoint = endpoint + "?address={}&{}".format(item, formatted_params)
+            # address
+            elif isinstance(item, str):
+                endpoint = endpoint + "?address={}&{}".format(item, formatted_params)
 
             endpoints.append((endpoint, item, product, product_subtype))
 
-        # Asynchronously call the API for each endpoint
-        loop = asyncio.get_event_loop()
-        response = loop.run_until_complete(self._http.endpoint_execute(endpoints))
-
-        if product == "economic/aal":
-            return zip(response, search_item)
-
-        return response
+        return endpoints
@@ -25,6 +25,69 @@ def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
 
     logging.info("Generating CSV file")
 
+    file_path = create_file_path(product, product_subtype, location_type, output_dir)
+    df = format_data(data, product, product_subtype, location_type)
+
+    # Export CSVs
+    if df['valid_id'].all():
+        df = df.drop(columns=['valid_id'])
+    else:
+        df['valid_id'] = df['valid_id'].fillna(True)
+
+    # Export CSVs
+    if 'error' in df and df['error'].isnull().all():
+        df = df.drop(columns=['error'])
+
+    df = df.fillna(pd.NA).astype(str)
+    df.to_csv(file_path, index=False)
+    logging.info("CSV generated to '{}'.".format(file_path))
+
+
+def to_csv_chunks(chunks, product, product_subtype, location_type=None, output_dir=None):
+    """Receives an iterable of lists of data, a product, a product subtype, and a location to create a CSV. Each list
+    is appended to the CSV and yielded back as it arrives, so the whole data is never held at once. The valid_id and
+    error columns are always kept, as later lists could still contain invalid ids
+
+    Args:
+        chunks (iterable): An iterable of lists of FSF object
+        product (str): The overall product to call
+        product_subtype (str): The product subtype (if suitable)
+        location_type (str): The location lookup type (if suitable)
+        output_dir (str): The output directory to save the generated csvs
+    Yields:
+        Each list of FSF object once it is written
+    """
+
+    logging.info("Generating CSV file")
+
+    file_path = create_file_path(product, product_subtype, location_type, output_dir)
+
+    header = True
+    for data in chunks:
+        df = format_data(data, product, product_subtype, location_type)
+        df['valid_id'] = df['valid_id'].fillna(True)
+
+        df = df.fillna(pd.NA).astype(str)
+        df.to_csv(file_path, index=False, mode='w' if header else 'a', header=header)
+        header = False
+
+        yield data
+
+    logging.info("CSV generated to '{}'.".format(file_path))
+
+
+def create_file_path(product, product_subtype, location_type=None, output_dir=None):
+    """Creates the output directory and the CSV file path for a product, a product subtype, and a location
+
+    Args:
+        product (str): The overall product to call
+        product_subtype (str): The product subtype (if suitable)
+        location_type (str): The location lookup type (if suitable)
+        output_dir (str): The output directory to save the generated csvs
+    Returns:
+        The path of the CSV file
+    """
+
     date = datetime.datetime.today().strftime('%Y_%m_%d_%H_%M_%S')
 
     # Set file name to the current date, time, and product
@@ -40,6 +103,21 @@ def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
 
+    return output_dir / file_name
+
+
+def format_data(data, product, product_subtype, location_type=None):
+    """Reformat the list of data to the format of the product, product subtype, and location
+
+    Args:
+        data (list): A list of FSF object
+        product (str): The overall product to call
+        product_subtype (str): The product subtype (if suitable)
+        location_type (str): The location lookup type (if suitable)
+    Returns:
+        A pandas formatted DataFrame
+    """
+
     # Format the data for each product
     if product == 'adaptation':
 
@@ -185,19 +263,7 @@ def to_csv(data, product, product_subtype, location_type=None, output_dir=None):
     else:
         raise NotImplementedError
 
-    # Export CSVs
-    if df['valid_id'].all():
-        df = df.drop(columns=['valid_id'])
-    else:
-        df['valid_id'] = df['valid_id'].fillna(True)
-
-    # Export CSVs
-    if 'error' in df and df['error'].isnull().all():
-        df = df.drop(columns=['error'])
-
-    df = df.fillna(pd.NA).astype(str)
-    df.to_csv(output_dir / file_name, index=False)
-    logging.info("CSV generated to '{}'.".format(output_dir / file_name))
+    return df
 
 
 def get_geom_center(geom):
@@ -226,7 +292,7 @@ def format_adaptation_detail(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode('type').explode('scenario').reset_index(drop=True)
+    df = pd.json_normalize([o.to_dict() for o in data]).explode('type').explode('scenario').reset_index(drop=True)
     df['adaptationId'] = df['adaptationId'].apply(str)
     df['returnPeriod'] = df['returnPeriod'].astype('Int64').apply(str)
     df['geometry'] = df['geometry'].apply(get_geom_center)
@@ -265,7 +331,7 @@ def format_adaptation_summary(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode('adaptation').reset_index(drop=True)
+    df = pd.json_normalize([o.to_dict() for o in data]).explode('adaptation').reset_index(drop=True)
     df['fsid'] = df['fsid'].apply(str)
     df['adaptation'] = df['adaptation'].astype('Int64').apply(str)
 
@@ -569,7 +635,7 @@ def format_environmental_precipitation(data):
         A pandas formatted DataFrame
     """
     #
-    df = pd.DataFrame([vars(o) for o in data]).explode('projected').reset_index(drop=True)
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('projected').reset_index(drop=True)
     if not df['projected'].isna().values.all():
         df = pd.concat([df.drop(['projected'], axis=1), df['projected'].apply(pd.Series)], axis=1)
         df = pd.concat([df.drop(['data'], axis=1), df['data'].apply(pd.Series)], axis=1)
@@ -598,7 +664,7 @@ def format_historic_event(data):
         A pandas formatted DataFrame
     """
 
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
     if not df['properties'].isna().values.all():
         df = pd.concat([df.drop(['properties'], axis=1), df['properties'].apply(pd.Series)], axis=1)
         df.rename(columns={'total': 'propertiesTotal', 'affected': 'propertiesAffected'}, inplace=True)
@@ -628,7 +694,7 @@ def format_historic_summary_property(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('historic').reset_index(drop=True)
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('historic').reset_index(drop=True)
     if not df['historic'].isna().values.all():
         df = pd.concat([df.drop(['historic'], axis=1), df['historic'].apply(pd.Series)], axis=1)
     else:
@@ -653,7 +719,7 @@ def format_historic_summary(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode('historic').reset_index(drop=True)
+    df = pd.json_normalize([o.to_dict() for o in data]).explode('historic').reset_index(drop=True)
     if not df['historic'].isna().values.all():
         df = pd.concat([df.drop(['historic'], axis=1), df['historic'].apply(pd.Series)], axis=1)
         df = df.explode('data').reset_index(drop=True)
@@ -717,7 +783,7 @@ def format_location_detail_property(data):
         A pandas formatted DataFrame
     """
 
-    df = pd.DataFrame([vars(o) for o in data]).explode('neighborhood').reset_index(drop=True)
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('neighborhood').reset_index(drop=True)
     df.rename(columns={'fsid': 'fsid_placeholder'}, inplace=True)
 
     if not df['city'].isna().values.all():
@@ -810,7 +876,7 @@ def format_location_detail_neighborhood(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('city').explode('county').reset_index(drop=True)
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('city').explode('county').reset_index(drop=True)
     df.rename(columns={'fsid': 'fsid_placeholder', 'name': 'name_placeholder'}, inplace=True)
 
     if not df['city'].isna().values.all():
@@ -856,7 +922,7 @@ def format_location_detail_city(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('zcta').explode('county') \
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('zcta').explode('county') \
         .explode('neighborhood').reset_index(drop=True)
     df.rename(columns={'fsid': 'fsid_placeholder', 'name': 'name_placeholder'}, inplace=True)
 
@@ -912,7 +978,7 @@ def format_location_detail_zcta(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('city').explode('county')
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('city').explode('county')
     df.rename(columns={'fsid': 'fsid_placeholder', 'name': 'name_placeholder'}, inplace=True)
 
     if not df['city'].isna().values.all():
@@ -958,7 +1024,7 @@ def format_location_detail_tract(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
     df.rename(columns={'fsid': 'fsid_placeholder'}, inplace=True)
 
     if not df['county'].isna().values.all():
@@ -995,7 +1061,7 @@ def format_location_detail_county(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('city').explode('zcta') \
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('city').explode('zcta') \
         .explode('cd').reset_index(drop=True)
     df.rename(columns={'fsid': 'fsid_placeholder', 'name': 'name_placeholder'}, inplace=True)
 
@@ -1051,7 +1117,7 @@ def format_location_detail_cd(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data]).explode('county')
+    df = pd.DataFrame([o.to_dict() for o in data]).explode('county')
     df.rename(columns={'fsid': 'fsid_placeholder'}, inplace=True)
 
     if not df['county'].isna().values.all():
@@ -1088,7 +1154,7 @@ def format_location_detail_state(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
     df['fsid'] = df['fsid'].apply(str)
     df['geometry'] = df['geometry'].apply(get_geom_center)
     df = pd.concat([df.drop(['geometry'], axis=1), df['geometry'].apply(pd.Series)], axis=1)
@@ -1103,7 +1169,7 @@ def format_location_summary_property(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
     df['fsid'] = df['fsid'].apply(str)
     df['riskDirection'] = df['riskDirection'].astype('Int64').apply(str)
     df['environmentalRisk'] = df['environmentalRisk'].astype('Int64').apply(str)
@@ -1122,7 +1188,7 @@ def format_location_summary(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
 
     if not df['properties'].isna().values.all():
         df = pd.concat([df.drop(['properties'], axis=1), df['properties'].apply(pd.Series)], axis=1)
@@ -1151,7 +1217,7 @@ def format_fema_nfip(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.DataFrame([vars(o) for o in data])
+    df = pd.DataFrame([o.to_dict() for o in data])
     df['fsid'] = df['fsid'].apply(str)
     df['claimCount'] = df['claimCount'].astype('Int64').apply(str)
     df['policyCount'] = df['policyCount'].astype('Int64').apply(str)
@@ -1172,7 +1238,7 @@ def format_aal_summary_property(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode('annual_loss')
+    df = pd.json_normalize([o.to_dict() for o in data]).explode('annual_loss')
     df = df.explode('depth_loss')
 
     if not df[['annual_loss', 'depth_loss']].isna().values.all():
@@ -1217,7 +1283,7 @@ def format_aal_summary(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode('annual_loss')
+    df = pd.json_normalize([o.to_dict() for o in data]).explode('annual_loss')
 
     if not df[['annual_loss']].isna().values.all():
         df = pd.concat([df.drop(['annual_loss'], axis=1), df['annual_loss'].apply(pd.Series)], axis=1)
@@ -1261,7 +1327,7 @@ def format_avm(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data])
+    df = pd.json_normalize([o.to_dict() for o in data])
 
     if 'avm.mid' in df:
         df.rename(columns={'avm.mid': 'avm_mid'}, inplace=True)
@@ -1286,7 +1352,7 @@ def format_avm_provider(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data])
+    df = pd.json_normalize([o.to_dict() for o in data])
 
     df['provider_id'] = df['provider_id'].astype('Int64').apply(str)
 
@@ -1301,7 +1367,7 @@ def format_economic_nfip_premium(data):
     Returns:
         A pandas formatted DataFrame
     """
-    df = pd.json_normalize([vars(o) for o in data]).explode("data")
+    df = pd.json_normalize([o.to_dict() for o in data]).explode("data")
 
     if not df[['data']].isna().values.all():
         df = pd.concat([df.drop(['data'], axis=1), df['data'].apply(pd.Series)], axis=1)
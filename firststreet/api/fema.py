@@ -7,7 +7,6 @@ import logging
 # Internal Imports
 from firststreet.api import csv_format
 from firststreet.api.api import Api
-from firststreet.errors import InvalidArgument
 from firststreet.models.fema import FemaNfip
 
 
@@ -37,10 +36,7 @@ class Fema(Api):
             TypeError: The location provided is not a string
         """
 
-        if not location_type:
-            raise InvalidArgument(location_type)
-        elif not isinstance(location_type, str):
-            raise TypeError("location is not a string")
+        self._validate_location(location_type)
 
         # Get data from api and create objects
         api_datas = self.call_api(search_items, "fema", "nfip", location_type, extra_param=extra_param)
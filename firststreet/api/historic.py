@@ -7,7 +7,6 @@ import logging
 # Internal Imports
 from firststreet.api import csv_format
 from firststreet.api.api import Api
-from firststreet.errors import InvalidArgument
 from firststreet.models.historic import HistoricEvent, HistoricSummary
 
 
@@ -64,17 +63,14 @@ class Historic(Api):
             TypeError: The location provided is not a string
         """
 
-        if not location_type:
-            raise InvalidArgument(location_type)
-        elif not isinstance(location_type, str):
-            raise TypeError("location is not a string")
+        self._validate_location(location_type)
 
         # Get data from api and create objects
         api_datas = self.call_api(search_items, "historic", "summary", location_type)
         summary = [HistoricSummary(api_data) for api_data in api_datas]
 
-        search_item = list(set([event.get("eventId") for sum_hist in summary if sum_hist.historic for
-                                event in sum_hist.historic]))
+        search_item = list(dict.fromkeys(event.get("eventId") for sum_hist in summary if sum_hist.historic for
+                                         event in sum_hist.historic))
 
         if search_item:
             api_datas_event = self.call_api(search_item, "historic", "event", None, extra_param=extra_param)
@@ -110,10 +106,7 @@ class Historic(Api):
             TypeError: The location provided is not a string
         """
 
-        if not location_type:
-            raise InvalidArgument(location_type)
-        elif not isinstance(location_type, str):
-            raise TypeError("location is not a string")
+        self._validate_location(location_type)
 
         # Get data from api and create objects
         api_datas = self.call_api(search_items, "historic", "summary", location_type, extra_param=extra_param)
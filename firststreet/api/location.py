@@ -101,10 +101,7 @@ class Location(Api):
             TypeError: The location provided is not a string
         """
 
-        if not location_type:
-            raise InvalidArgument(location_type)
-        elif not isinstance(location_type, str):
-            raise TypeError("location is not a string")
+        self._validate_location(location_type)
 
         # Get data from api and create objects
         api_datas = self.call_api(search_items, "location", "summary", location_type, extra_param=extra_param)
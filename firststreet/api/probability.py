@@ -5,12 +5,12 @@
 import logging
 
 # Internal Imports
-from firststreet.api import csv_format
 from firststreet.api.api import Api
-from firststreet.errors import InvalidArgument
 from firststreet.models.probability import ProbabilityChance, ProbabilityCount, ProbabilityCountSummary, \
     ProbabilityCumulative, ProbabilityDepth
 
+_logger = logging.getLogger(__name__)
+
 
 class Probability(Api):
     """This class receives a list of search_items and handles the creation of a probability product from the request.
@@ -21,9 +21,10 @@ class Probability(Api):
             get_count: Retrieves a list of Probability Depth for the given list of IDs
             get_count_summary: Retrieves a list of Probability Depth for the given list of IDs
             get_cumulative: Retrieves a list of Probability Depth for the given list of IDs
+            get_all: Retrieves the Probability Chance, Count, Cumulative, and Depth for the given list of IDs
         """
 
-    def get_chance(self, search_items, csv=False, output_dir=None, extra_param=None):
+    def get_chance(self, search_items, csv=False, output_dir=None, extra_param=None, vectorized=False, stream=False):
         """Retrieves probability chance product data from the First Street Foundation API given a list of search_items
          and returns a list of Probability Chance objects.
 
@@ -33,23 +34,35 @@ class Probability(Api):
             csv (bool): To output extracted data to a csv or not
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            vectorized (bool): To return a Product Batch backed by a DataFrame instead of a list
+            stream (bool): To call the API in chunks. Writes each chunk to the csv and returns None if csv, otherwise
+                returns an iterator of the objects. Cannot be combined with vectorized
 
         Returns:
             A list of Probability Chance
         """
 
+        if stream:
+            return self._stream(search_items, "probability", "chance", "property", ProbabilityChance, csv=csv,
+                                output_dir=output_dir, extra_param=extra_param, vectorized=vectorized)
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "probability", "chance", "property", extra_param=extra_param)
-        product = [ProbabilityChance(api_data) for api_data in api_datas]
+        if vectorized:
+            api_datas = self.call_api(search_items, "probability", "chance", "property", extra_param=extra_param)
+            product = ProbabilityChance.from_records(api_datas)
+        else:
+            product = self.call_api(search_items, "probability", "chance", "property", extra_param=extra_param,
+                                    row_factory=ProbabilityChance)
 
         if csv:
-            csv_format.to_csv(product, "probability", "chance", output_dir=output_dir)
+            self._to_csv(self._snapshot(product), "probability", "chance", output_dir=output_dir)
 
-        logging.info("Probability Chance Data Ready.")
+        _logger.info("Probability Chance Data Ready.")
 
         return product
 
-    def get_count(self, search_items, location_type, csv=False, output_dir=None, extra_param=None):
+    def get_count(self, search_items, location_type, csv=False, output_dir=None, extra_param=None,
+                  vectorized=False, stream=False):
         """Retrieves probability count product data from the First Street Foundation API given a list of search_items
          and returns a list of Probability Count objects.
 
@@ -60,6 +73,9 @@ class Probability(Api):
             csv (bool): To output extracted data to a csv or not
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            vectorized (bool): To return a Product Batch backed by a DataFrame instead of a list
+            stream (bool): To call the API in chunks. Writes each chunk to the csv and returns None if csv, otherwise
+                returns an iterator of the objects. Cannot be combined with vectorized
 
         Returns:
             A list of Probability Count
@@ -68,23 +84,30 @@ class Probability(Api):
             TypeError: The location provided is not a string
         """
 
-        if not location_type:
-            raise InvalidArgument(location_type)
-        elif not isinstance(location_type, str):
-            raise TypeError("location is not a string")
+        self._validate_location(location_type)
+
+        if stream:
+            return self._stream(search_items, "probability", "count", location_type, ProbabilityCount, csv=csv,
+                                csv_location_type=location_type, output_dir=output_dir, extra_param=extra_param,
+                                vectorized=vectorized)
 
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "probability", "count", location_type, extra_param=extra_param)
-        product = [ProbabilityCount(api_data) for api_data in api_datas]
+        if vectorized:
+            api_datas = self.call_api(search_items, "probability", "count", location_type, extra_param=extra_param)
+            product = ProbabilityCount.from_records(api_datas)
+        else:
+            product = self.call_api(search_items, "probability", "count", location_type, extra_param=extra_param,
+                                    row_factory=ProbabilityCount)
 
         if csv:
-            csv_format.to_csv(product, "probability", "count", location_type, output_dir=output_dir)
+            self._to_csv(self._snapshot(product), "probability", "count", location_type, output_dir=output_dir)
 
-        logging.info("Probability Count Data Ready.")
+        _logger.info("Probability Count Data Ready.")
 
         return product
 
-    def get_count_summary(self, search_items, csv=False, output_dir=None, extra_param=None):
+    def get_count_summary(self, search_items, csv=False, output_dir=None, extra_param=None,
+                          vectorized=False, stream=False):
         """Retrieves probability Count-Summary product data from the First Street Foundation API given a list of
         search_items and returns a list of Probability Count-Summary object.
 
@@ -94,23 +117,35 @@ class Probability(Api):
             csv (bool): To output extracted data to a csv or not
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            vectorized (bool): To return a Product Batch backed by a DataFrame instead of a list
+            stream (bool): To call the API in chunks. Writes each chunk to the csv and returns None if csv, otherwise
+                returns an iterator of the objects. Cannot be combined with vectorized
 
         Returns:
             A list of Probability Count-Summary
         """
 
+        if stream:
+            return self._stream(search_items, "probability", "count-summary", "property", ProbabilityCountSummary,
+                                csv=csv, output_dir=output_dir, extra_param=extra_param, vectorized=vectorized)
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "probability", "count-summary", "property", extra_param=extra_param)
-        product = [ProbabilityCountSummary(api_data) for api_data in api_datas]
+        if vectorized:
+            api_datas = self.call_api(search_items, "probability", "count-summary", "property", extra_param=extra_param)
+            product = ProbabilityCountSummary.from_records(api_datas)
+        else:
+            product = self.call_api(search_items, "probability", "count-summary", "property", extra_param=extra_param,
+                                    row_factory=ProbabilityCountSummary)
 
         if csv:
-            csv_format.to_csv(product, "probability", "count-summary", output_dir=output_dir)
+            self._to_csv(self._snapshot(product), "probability", "count-summary", output_dir=output_dir)
 
-        logging.info("Probability Count-Summary Data Ready.")
+        _logger.info("Probability Count-Summary Data Ready.")
 
         return product
 
-    def get_cumulative(self, search_items, csv=False, output_dir=None, extra_param=None):
+    def get_cumulative(self, search_items, csv=False, output_dir=None, extra_param=None,
+                       vectorized=False, stream=False):
         """Retrieves probability cumulative product data from the First Street Foundation API given a list of
         search_items and returns a list of Probability Cumulative object.
 
@@ -120,23 +155,34 @@ class Probability(Api):
             csv (bool): To output extracted data to a csv or not
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            vectorized (bool): To return a Product Batch backed by a DataFrame instead of a list
+            stream (bool): To call the API in chunks. Writes each chunk to the csv and returns None if csv, otherwise
+                returns an iterator of the objects. Cannot be combined with vectorized
 
         Returns:
             A list of Probability Cumulative
         """
 
+        if stream:
+            return self._stream(search_items, "probability", "cumulative", "property", ProbabilityCumulative, csv=csv,
+                                output_dir=output_dir, extra_param=extra_param, vectorized=vectorized)
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "probability", "cumulative", "property", extra_param=extra_param)
-        product = [ProbabilityCumulative(api_data) for api_data in api_datas]
+        if vectorized:
+            api_datas = self.call_api(search_items, "probability", "cumulative", "property", extra_param=extra_param)
+            product = ProbabilityCumulative.from_records(api_datas)
+        else:
+            product = self.call_api(search_items, "probability", "cumulative", "property", extra_param=extra_param,
+                                    row_factory=ProbabilityCumulative)
 
         if csv:
-            csv_format.to_csv(product, "probability", "cumulative", output_dir=output_dir)
+            self._to_csv(self._snapshot(product), "probability", "cumulative", output_dir=output_dir)
 
-        logging.info("Probability Cumulative Data Ready.")
+        _logger.info("Probability Cumulative Data Ready.")
 
         return product
 
-    def get_depth(self, search_items, csv=False, output_dir=None, extra_param=None):
+    def get_depth(self, search_items, csv=False, output_dir=None, extra_param=None, vectorized=False, stream=False):
         """Retrieves probability depth product data from the First Street Foundation API given a list of search_items
          and returns a list of Probability Depth objects.
 
@@ -146,18 +192,71 @@ class Probability(Api):
             csv (bool): To output extracted data to a csv or not
             output_dir (str): The output directory to save the generated csvs
             extra_param (dict): Extra parameter to be added to the url
+            vectorized (bool): To return a Product Batch backed by a DataFrame instead of a list
+            stream (bool): To call the API in chunks. Writes each chunk to the csv and returns None if csv, otherwise
+                returns an iterator of the objects. Cannot be combined with vectorized
 
         Returns:
             A list of Probability Depth
         """
 
+        if stream:
+            return self._stream(search_items, "probability", "depth", "property", ProbabilityDepth, csv=csv,
+                                output_dir=output_dir, extra_param=extra_param, vectorized=vectorized)
+
         # Get data from api and create objects
-        api_datas = self.call_api(search_items, "probability", "depth", "property", extra_param=extra_param)
-        product = [ProbabilityDepth(api_data) for api_data in api_datas]
+        if vectorized:
+            api_datas = self.call_api(search_items, "probability", "depth", "property", extra_param=extra_param)
+            product = ProbabilityDepth.from_records(api_datas)
+        else:
+            product = self.call_api(search_items, "probability", "depth", "property", extra_param=extra_param,
+                                    row_factory=ProbabilityDepth)
 
         if csv:
-            csv_format.to_csv(product, "probability", "depth", output_dir=output_dir)
+            self._to_csv(self._snapshot(product), "probability", "depth", output_dir=output_dir)
 
-        logging.info("Probability Depth Data Ready.")
+        _logger.info("Probability Depth Data Ready.")
 
         return product
+
+    def get_all(self, search_items, location_type="property", csv=False, output_dir=None, extra_param=None):
+        """Retrieves probability chance, count, cumulative, and depth product data from the First Street Foundation API
+        given a list of search_items in a single batch of calls, and returns a list of each product.
+
+        Args:
+            search_items (list/file): A First Street Foundation IDs, lat/lng pair, address, or a
+                file of First Street Foundation IDs
+            location_type (str): The location lookup type of the Probability Count
+            csv (bool): To output extracted data to a csv or not
+            output_dir (str): The output directory to save the generated csvs
+            extra_param (dict): Extra parameter to be added to the url
+
+        Returns:
+            A list of list of Probability Chance, Probability Count, Probability Cumulative, and Probability Depth
+        Raises:
+            InvalidArgument: The location provided is empty, or no search items are provided
+            TypeError: The location provided is not a string
+        """
+
+        self._validate_location(location_type)
+
+        # Get data from api for every product together and create objects
+        api_datas_chance, api_datas_count, api_datas_cumulative, api_datas_depth = \
+            self.call_api_batch(search_items, [("probability", "chance", "property"),
+                                               ("probability", "count", location_type),
+                                               ("probability", "cumulative", "property"),
+                                               ("probability", "depth", "property")], extra_param=extra_param)
+        chance = list(map(ProbabilityChance, api_datas_chance))
+        count = list(map(ProbabilityCount, api_datas_count))
+        cumulative = list(map(ProbabilityCumulative, api_datas_cumulative))
+        depth = list(map(ProbabilityDepth, api_datas_depth))
+
+        if csv:
+            self._to_csv(self._snapshot(chance), "probability", "chance", output_dir=output_dir)
+            self._to_csv(self._snapshot(count), "probability", "count", location_type, output_dir=output_dir)
+            self._to_csv(self._snapshot(cumulative), "probability", "cumulative", output_dir=output_dir)
+            self._to_csv(self._snapshot(depth), "probability", "depth", output_dir=output_dir)
+
+        _logger.info("Probability Chance Count Cumulative Depth Data Ready.")
+
+        return [chance, count, cumulative, depth]
@@ -3,11 +3,25 @@
 
 # Standard Imports
 import asyncio
+import math
+import time
+
+# resource is only available on Unix
+try:
+    import resource
+except ImportError:
+    resource = None
 
 # External Imports
 import logging
 from json.decoder import JSONDecodeError
 
+# orjson is optional and decodes the responses faster. Its errors subclass JSONDecodeError
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
 import tqdm
 import aiohttp
 import ssl
@@ -19,18 +33,38 @@ import firststreet.errors as e
 
 DEFAULT_SUMMARY_VERSION = 'v1'
 
+# The connection limit used before any round trip is measured, and the max an automatic connection limit can reach
+DEFAULT_CONNECTION_LIMIT = 100
+MAX_AUTO_CONNECTION_LIMIT = 500
+
+
+def _file_descriptor_limit():
+    """Returns the number of connections the soft limit of open file descriptors allows, keeping half of the
+    descriptors for everything else, or None if there is no limit
+    """
+    if resource is None:
+        return None
+
+    soft_limit = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+    if soft_limit == resource.RLIM_INFINITY:
+        return None
+
+    return max(1, soft_limit // 2)
+
 
 class Http:
     """This class handles the communication with the First Street Foundation API by constructing and sending the HTTP
         requests, and handles any errors during the execution.
         Attributes:
             api_key (str): A string specifying the API key.
-            connection_limit (int): The max number of connections to make
+            connection_limit (int/None): The max number of connections to make. If None, it is set from the rate limit
+                and the measured round trip time of the requests
             rate_limit (int): The max number of requests during the period
             rate_period (int): The period of time for the limit
             version (str): The version to call the API with
         Methods:
             endpoint_execute: Sets up the throttler and session for the asynchronous call
+            get_connection_limit: Returns the number of connections to make
             execute: Sends a request to the First Street Foundation API for the specified endpoint
             tile_response: Handles the response for a tile
             product_response: Handles the response for all other products
@@ -57,34 +91,95 @@ class Http:
         self.connection_limit = connection_limit
         self.rate_limit = rate_limit
         self.rate_period = rate_period
+        self._rtt = None
+
+    def get_connection_limit(self):
+        """Returns the number of connections to make. Unless a connection limit was given, this is the number of
+        requests that must be in flight to reach the rate limit at the measured round trip time (Little's law), never
+        over MAX_AUTO_CONNECTION_LIMIT or half the soft limit of open file descriptors. Note FirstStreet and the
+        command line pass a connection limit of 100 unless told otherwise
+        Returns:
+            The number of connections to make
+        """
+        if self.connection_limit:
+            return self.connection_limit
+
+        fd_limit = _file_descriptor_limit() or MAX_AUTO_CONNECTION_LIMIT
+        if self._rtt is None:
+            return min(DEFAULT_CONNECTION_LIMIT, fd_limit)
+
+        limit = math.ceil(self.rate_limit / self.rate_period * self._rtt)
+        return max(1, min(limit, MAX_AUTO_CONNECTION_LIMIT, fd_limit))
 
-    async def bound_fetch(self, sem, endpoint, session, throttler):
+    def _record_rtt(self, rtt):
+        """Updates the moving average of the round trip time
+        Args:
+            rtt (float): The round trip time of a request in seconds
+        """
+        if self._rtt is None:
+            self._rtt = rtt
+        else:
+            self._rtt = 0.8 * self._rtt + 0.2 * rtt
+
+    async def bound_fetch(self, sem, endpoint, session, throttler, row_factory=None):
         async with sem:
-            return await self.execute(endpoint, session, throttler)
+            response = await self.execute(endpoint, session, throttler)
+
+        if row_factory:
+            return row_factory(response)
+
+        return response
 
-    async def endpoint_execute(self, endpoints):
+    async def endpoint_execute(self, endpoints, follow_up=None, row_factory=None, follow_endpoints=None):
         """Asynchronously calls each endpoint and returns the JSON responses
         Args:
             endpoints (list): List of endpoints to get
+            follow_up (callable): Receives each JSON response as it completes and returns a list of further endpoints
+                to get with the same session
+            row_factory (callable): Creates an object from each JSON response as soon as it is read. The objects are
+                returned in place of the JSON responses
+            follow_endpoints (list): Follow up endpoints already known before any response arrives. Their JSON
+                responses come first in the follow up responses
         Returns:
-            The list of JSON responses corresponding to each endpoint
+            The list of JSON responses corresponding to each endpoint. If follow_up is given, a tuple of that list
+            and the list of JSON responses of the follow up endpoints
         """
 
         throttler = Throttler(rate_limit=self.rate_limit, period=self.rate_period)
         ssl_ctx = ssl.create_default_context(cafile=certifi.where())
 
-        connector = aiohttp.TCPConnector(limit_per_host=self.connection_limit, ssl=ssl_ctx)
+        # Set both limits, as the connector otherwise caps the total connections at its default of 100
+        connection_limit = self.get_connection_limit()
+        connector = aiohttp.TCPConnector(limit=connection_limit, limit_per_host=connection_limit, ssl=ssl_ctx)
         session = aiohttp.ClientSession(connector=connector)
 
         # Asnycio create tasks for each endpoint
         try:
 
-            sem = asyncio.Semaphore(self.connection_limit)
-            tasks = [asyncio.create_task(self.bound_fetch(sem, endpoint, session, throttler)) for endpoint in endpoints]
+            sem = asyncio.Semaphore(connection_limit)
+            tasks = [asyncio.create_task(self.bound_fetch(sem, endpoint, session, throttler, row_factory))
+                     for endpoint in endpoints]
+            follow_tasks = [asyncio.create_task(self.bound_fetch(sem, endpoint, session, throttler))
+                            for endpoint in follow_endpoints or ()]
+
+            for f in tqdm.tqdm(asyncio.as_completed(tasks), total=len(endpoints)):
+                result = await f
+
+                # Dispatch the follow up calls while the remaining endpoints are in flight
+                if follow_up:
+                    follow_tasks.extend(asyncio.create_task(self.bound_fetch(sem, endpoint, session, throttler))
+                                        for endpoint in follow_up(result))
 
-            [await f for f in tqdm.tqdm(asyncio.as_completed(tasks), total=len(endpoints))]
             ret = [t.result() for t in tasks]
 
+            if follow_up:
+
+                # Every follow up call is dispatched by now, so a second bar shows their progress
+                for f in tqdm.tqdm(asyncio.as_completed(follow_tasks), total=len(follow_tasks)):
+                    await f
+
+                ret = (ret, [t.result() for t in follow_tasks])
+
         finally:
             await session.close()
 
@@ -111,7 +206,9 @@ class Http:
             # Throttle
             async with throttler:
                 try:
+                    start = time.monotonic()
                     async with session.get(endpoint[0], headers=headers, ssl=False) as response:
+                        self._record_rtt(time.monotonic() - start)
 
                         # Read a tile response
                         if endpoint[2] == 'tile':
@@ -158,7 +255,7 @@ class Http:
         # Get rate limit from header
         rate_limit = self._parse_rate_limit(response.headers)
 
-        body = await response.json(content_type=None)
+        body = await response.json(content_type=None, loads=json_loads)
 
         try:
             if response.status != 200 and response.status != 404 and response.status != 500:
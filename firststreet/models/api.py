@@ -1,6 +1,12 @@
 # Author: Kelvin Lai <kelvin@firststreet.org>
 # Copyright: This module is owned by First Street Foundation
 
+# Standard Imports
+from collections.abc import Sequence
+
+# External Imports
+import pandas as pd
+
 
 class Api:
     """Creates an Api interface given a response
@@ -9,6 +15,8 @@ class Api:
         response (JSON): A JSON response received from the API
     """
 
+    __slots__ = ('valid_id', 'error')
+
     def __init__(self, response):
         if response.get('valid_id') is not None:
             self.valid_id = response.get('valid_id')
@@ -19,3 +27,63 @@ class Api:
             self.error = response.get('error')
         else:
             self.error = None
+
+    def to_dict(self):
+        """Returns the attributes of the object as a dictionary, whether they are stored in slots or not
+
+        Returns:
+            A dictionary of attribute names to values
+        """
+        attributes = {name: getattr(self, name) for cls in reversed(type(self).__mro__)
+                      for name in vars(cls).get('__slots__', ()) if hasattr(self, name)}
+        attributes.update(getattr(self, '__dict__', {}))
+
+        return attributes
+
+    @classmethod
+    def from_records(cls, responses):
+        """Creates a Product Batch of this product given a list of responses
+
+        Args:
+            responses (list): A list of JSON responses received from the API
+        Returns:
+            A Product Batch
+        """
+        return ProductBatch(responses, cls)
+
+
+class ProductBatch(Sequence):
+    """Creates a batch of products given a list of responses. The responses are kept as a column based DataFrame, and
+    each product object is only created when it is indexed
+
+    Args:
+        responses (list): A list of JSON responses received from the API
+        model (class): The product class created for each response
+    """
+
+    def __init__(self, responses, model):
+        self.responses = list(responses)
+        self.model = model
+        self._products = [None] * len(self.responses)
+        self._frame = None
+
+    def __len__(self):
+        return len(self.responses)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+
+        product = self._products[index]
+        if product is None:
+            product = self._products[index] = self.model(self.responses[index])
+
+        return product
+
+    @property
+    def frame(self):
+        """The flattened responses as a pandas DataFrame"""
+        if self._frame is None:
+            self._frame = pd.json_normalize(self.responses)
+
+        return self._frame
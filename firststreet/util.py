@@ -1,6 +1,9 @@
 # Author: Kelvin Lai <kelvin@firststreet.org>
 # Copyright: This module is owned by First Street Foundation
 import ast
+import copy
+import time
+from collections import OrderedDict
 
 
 def read_search_items_from_file(file_name):
@@ -31,3 +34,59 @@ def read_search_items_from_file(file_name):
             count += 1
 
     return search_items
+
+
+class ResponseCache:
+    """A least recently used cache of JSON responses, where each response expires after a time to live. Responses are
+    copied in and out of the cache, so the objects created from them can be modified without changing the cache
+
+    Args:
+        maxsize (int): The max number of responses to keep
+        ttl (int): The number of seconds each response is kept for
+    """
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._responses = OrderedDict()
+
+    def __len__(self):
+        return len(self._responses)
+
+    def get(self, key):
+        """Returns the cached response for the key
+
+        Args:
+            key (hashable): The key of the response
+        Returns:
+            A copy of the JSON response, or None if it is not cached or has expired
+        """
+
+        entry = self._responses.get(key)
+        if entry is None:
+            return None
+
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._responses[key]
+            return None
+
+        self._responses.move_to_end(key)
+        return copy.deepcopy(entry[1])
+
+    def set(self, key, response):
+        """Caches the response for the key, removing the least recently used responses past the max size
+
+        Args:
+            key (hashable): The key of the response
+            response (JSON): The JSON response to cache
+        """
+
+        self._responses[key] = (time.monotonic(), copy.deepcopy(response))
+        self._responses.move_to_end(key)
+
+        while len(self._responses) > self.maxsize:
+            self._responses.popitem(last=False)
+
+    def clear(self):
+        """Removes every cached response"""
+        self._responses.clear()
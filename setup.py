@@ -7,7 +7,8 @@ with open('requirements.txt') as f:
     requirements = [x.strip() for x in f.readlines()]
 
 with open('extra_test_requires.txt') as f:
-    extra = {'testing': [x.strip() for x in f.readlines()]}
+    extra = {'testing': [x.strip() for x in f.readlines()],
+             'speedups': ['orjson>=3.4.0']}
 
 setup(
     name='fsf-api-access_python',
@@ -41,6 +41,24 @@ class TestAdaptationDetail:
         assert adaptation[0].type is not None
         assert adaptation[0].valid_id is True
 
+    def test_single_cached(self):
+        adaptation_id = [2739]
+        adaptation = fs.adaptation.get_detail(adaptation_id)
+        cached = fs.adaptation.get_detail(adaptation_id)
+        assert len(cached) == 1
+        assert cached[0].adaptationId == adaptation[0].adaptationId
+        assert cached[0].name == adaptation[0].name
+        assert cached[0].valid_id is True
+
+    def test_single_vectorized(self):
+        adaptation_id = [2739]
+        adaptation = fs.adaptation.get_detail(adaptation_id, vectorized=True)
+        assert len(adaptation) == 1
+        assert adaptation.frame['adaptationId'][0] == adaptation_id[0]
+        assert adaptation[0].adaptationId == str(adaptation_id[0])
+        assert adaptation[0].type is not None
+        assert adaptation[0].valid_id is True
+
     def test_multiple(self):
         adaptation_id = [2739, 2741]
         adaptation = fs.adaptation.get_detail(adaptation_id)
@@ -61,6 +79,13 @@ class TestAdaptationDetail:
         assert adaptation[0].type is not None
         assert adaptation[0].valid_id is True
 
+    def test_single_csv_flush(self, tmpdir):
+        adaptation_id = [2739]
+        adaptation = fs.adaptation.get_detail(adaptation_id, csv=True, output_dir=tmpdir)
+        fs.adaptation.flush()
+        assert len(adaptation) == 1
+        assert len(tmpdir.listdir()) == 1
+
     def test_multiple_csv(self, tmpdir):
         adaptation_id = [2739, 2741]
         adaptation = fs.adaptation.get_detail(adaptation_id, csv=True, output_dir=tmpdir)
@@ -382,6 +407,27 @@ class TestAdaptationSummaryDetail:
         assert adaptation[0][0].valid_id is True
         assert adaptation[1][0].valid_id is True
 
+    def test_single_cached(self):
+        fsid = [1935265]
+        adaptation = fs.adaptation.get_detail_by_location(fsid, "city")
+        cached = fs.adaptation.get_detail_by_location(fsid, "city")
+        assert len(cached[0]) == len(adaptation[0])
+        assert len(cached[1]) == len(adaptation[1])
+        assert cached[0][0].adaptation == adaptation[0][0].adaptation
+        fs.adaptation.clear_cache()
+        refreshed = fs.adaptation.get_detail_by_location(fsid, "city")
+        assert len(refreshed[1]) == len(adaptation[1])
+
+    def test_single_split_csv(self, tmpdir):
+        fsid = [1935265]
+        adaptation = fs.adaptation.get_detail_by_location(fsid, "city", csv=True, output_dir=tmpdir, split_csv=True)
+        fs.adaptation.flush()
+        assert len(adaptation[0]) == 1
+        assert len(adaptation[1]) == 2
+        assert adaptation[0][0].fsid == str(fsid[0])
+        assert adaptation[1][0].type is not None
+        assert len(tmpdir.listdir()) == 2
+
     def test_multiple_csv(self, tmpdir):
         fsid = [1935265, 1714000]
         adaptation = fs.adaptation.get_detail_by_location(fsid, "city", csv=True, output_dir=tmpdir)
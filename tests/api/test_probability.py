@@ -41,6 +41,15 @@ class TestProbabilityChance:
         assert probability[0].chance is not None
         assert probability[0].valid_id is True
 
+    def test_single_vectorized(self):
+        fsid = [190836953]
+        probability = fs.probability.get_chance(fsid, vectorized=True)
+        assert len(probability) == 1
+        assert probability.frame['fsid'][0] == fsid[0]
+        assert probability[0].fsid == str(fsid[0])
+        assert probability[0].chance is not None
+        assert probability[0].valid_id is True
+
     def test_multiple(self):
         fsid = [190836953, 193139123]
         probability = fs.probability.get_chance(fsid)
@@ -73,6 +82,22 @@ class TestProbabilityChance:
         assert probability[1].chance is not None
         assert probability[1].valid_id is True
 
+    def test_multiple_stream_csv(self, tmpdir):
+        fsid = [190836953, 193139123]
+        probability = fs.probability.get_chance(fsid, csv=True, output_dir=tmpdir, stream=True)
+        assert probability is None
+        assert len(tmpdir.listdir()) == 1
+
+    def test_multiple_stream(self):
+        fsid = [190836953, 193139123]
+        probability = list(fs.probability.get_chance(fsid, stream=True))
+        assert len(probability) == 2
+        probability.sort(key=lambda x: x.fsid)
+        assert probability[0].fsid == str(fsid[0])
+        assert probability[1].fsid == str(fsid[1])
+        assert probability[0].chance is not None
+        assert probability[1].chance is not None
+
     def test_mixed_invalid(self):
         fsid = [190836953, 000000000]
         probability = fs.probability.get_chance(fsid)
@@ -755,3 +780,36 @@ class TestProbabilityDepth:
         assert probability[0].depth[0].get("data")[0].get("data").get("low") is not None
         assert probability[0].depth[0].get("data")[0].get("data").get("mid") is not None
         assert probability[0].depth[0].get("data")[0].get("data").get("high") is not None
+
+
+class TestProbabilityAll:
+
+    def test_empty(self):
+        with pytest.raises(InvalidArgument):
+            fs.probability.get_all([])
+
+    def test_empty_location(self):
+        with pytest.raises(InvalidArgument):
+            fs.probability.get_all([390000227], "")
+
+    def test_single(self):
+        fsid = [390000227]
+        probability = fs.probability.get_all(fsid)
+        assert len(probability) == 4
+        chance, count, cumulative, depth = probability
+        assert chance[0].fsid == str(fsid[0])
+        assert chance[0].chance is not None
+        assert count[0].fsid == str(fsid[0])
+        assert count[0].count is not None
+        assert cumulative[0].fsid == str(fsid[0])
+        assert cumulative[0].cumulative is not None
+        assert depth[0].fsid == str(fsid[0])
+        assert depth[0].depth is not None
+
+    def test_single_csv(self, tmpdir):
+        fsid = [390000227]
+        probability = fs.probability.get_all(fsid, csv=True, output_dir=tmpdir)
+        fs.probability.flush()
+        assert len(probability) == 4
+        assert all(product[0].valid_id is True for product in probability)
+        assert len(tmpdir.listdir()) == 4
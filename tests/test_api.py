@@ -2,14 +2,42 @@
 # Copyright: This module is owned by First Street Foundation
 
 # Standard Imports
+import asyncio
 import os
+import random
 
 # External Imports
 import pytest
 
 # Internal Imports
 import firststreet
+import firststreet.api.api
+import firststreet.api.csv_format
+from firststreet.api.adaptation import Adaptation
+from firststreet.api.probability import Probability
 from firststreet.errors import InvalidArgument, MissingAPIKeyError
+from firststreet.http_util import Http
+
+
+class StubHttp(Http):
+    """Serves the responses of a function instead of calling the API, recording each requested url"""
+
+    def __init__(self, respond):
+        super().__init__("", None, 4950, 60)
+        self.respond = respond
+        self.requested = []
+
+    async def execute(self, endpoint, session, throttler):
+        self.requested.append(endpoint[0])
+
+        # Complete out of order, as the API does
+        await asyncio.sleep(random.random() / 100)
+        return self.respond(endpoint)
+
+
+def chance_response(endpoint):
+    return {"fsid": endpoint[1],
+            "chance": [{"year": 2020, "data": [{"threshold": 0, "low": 0.1, "mid": 0.2, "high": 0.3}]}]}
 
 
 class TestApi:
@@ -73,3 +101,220 @@ class TestApi:
         assert loc[0].route == 'BUCKEYE RD'
         assert loc[1].route == 'BUCKEYE RD'
         assert loc[2].route == 'BUCKEYE RD'
+
+
+def adaptation_response(endpoint):
+    if endpoint[3] == "summary":
+        return {"fsid": endpoint[1], "adaptation": ADAPTATIONS[endpoint[1]], "properties": {"total": 1}}
+
+    return {"adaptationId": endpoint[1], "name": "Adaptation {}".format(endpoint[1]), "type": ["levee"],
+            "scenario": ["fluvial"], "conveyance": False, "returnPeriod": 100,
+            "serving": dict.fromkeys(["property", "neighborhood", "zcta", "tract", "city", "county", "cd", "state"],
+                                     [])}
+
+
+# The adaptations of each location, sharing some adaptations between locations
+ADAPTATIONS = {1: [10, 11], 2: [12], 3: [11, 13, 14], 4: [], 5: [15, 10], 6: [16, 17]}
+
+
+class TestAdaptationOrder:
+
+    def test_detail_order(self, tmp_path):
+        expected = [10, 11, 12, 13, 14, 15, 16, 17]
+
+        # The responses complete in a random order each time
+        for _ in range(5):
+            adaptation = Adaptation(StubHttp(adaptation_response))
+            summary, detail = adaptation.get_detail_by_location(list(ADAPTATIONS), "city", csv=True,
+                                                                output_dir=str(tmp_path), split_csv=True)
+
+            # The split csvs are written in the background by the shared process pool
+            assert len(adaptation._pending_writes) == 2
+            adaptation.flush()
+            assert Adaptation._process_pool is not None
+            assert [s.fsid for s in summary] == [str(fsid) for fsid in ADAPTATIONS]
+            assert [d.adaptationId for d in detail] == [str(adaptation_id) for adaptation_id in expected]
+
+        detail_csv = next(path for path in tmp_path.iterdir() if "detail" in path.name)
+        lines = detail_csv.read_text().splitlines()
+        assert [line.split(",")[0] for line in lines[1:]] == [str(adaptation_id) for adaptation_id in expected]
+
+    def test_split_csv_without_csv(self):
+        adaptation = Adaptation(StubHttp(adaptation_response))
+        with pytest.raises(InvalidArgument):
+            adaptation.get_detail_by_location([1], "city", split_csv=True)
+        assert adaptation._http.requested == []
+
+
+class TestAdaptationCache:
+
+    @staticmethod
+    def stub_call_api(adaptation):
+        """Serves the detail responses without the API, returning the list of search items of each call"""
+        calls = []
+
+        def call_api(search_items, *args, **kwargs):
+            calls.append(list(search_items))
+            return [adaptation_response((None, item, "adaptation", "detail")) for item in search_items]
+
+        adaptation.call_api = call_api
+        return calls
+
+    def test_get_details_misses(self):
+        adaptation = Adaptation(StubHttp(adaptation_response))
+        calls = self.stub_call_api(adaptation)
+
+        first = adaptation._get_details([10, 11])
+        second = adaptation._get_details([11, 12, 10])
+        assert calls == [[10, 11], [12]]
+        assert [api_data["adaptationId"] for api_data in first] == [10, 11]
+        assert [api_data["adaptationId"] for api_data in second] == [11, 12, 10]
+
+        # Everything is cached now
+        adaptation._get_details([12, 11])
+        assert len(calls) == 2
+
+    def test_get_details_not_cached_with_extra_param(self):
+        adaptation = Adaptation(StubHttp(adaptation_response))
+        calls = self.stub_call_api(adaptation)
+
+        adaptation._get_details([10], extra_param={"key": "value"})
+        adaptation._get_details([10], extra_param={"key": "value"})
+        assert calls == [[10], [10]]
+
+
+class TestAdaptationLocationCache:
+
+    def test_overlapping_locations(self):
+        adaptation = Adaptation(StubHttp(adaptation_response))
+        requested = adaptation._http.requested
+
+        adaptation.get_detail_by_location([1, 2, 3], "city")
+        assert len(requested) == 3 + 5
+
+        # Only location 5 and its adaptation 15 are new, as 10 came with location 1
+        del requested[:]
+        summary, detail = adaptation.get_detail_by_location([2, 3, 5], "city")
+        expected = [endpoint[0] for endpoint in adaptation._create_endpoints([5], "adaptation", "summary", "city") +
+                    adaptation._create_endpoints([15], "adaptation", "detail")]
+        assert sorted(requested) == sorted(expected)
+        assert [s.fsid for s in summary] == ["2", "3", "5"]
+        assert [d.adaptationId for d in detail] == ["12", "11", "13", "14", "15", "10"]
+
+    def test_cached_not_shared(self):
+        adaptation = Adaptation(StubHttp(adaptation_response))
+        summary, detail = adaptation.get_detail_by_location([1], "city")
+        summary[0].adaptation.append(99)
+        detail[0].type.append("wall")
+
+        summary, detail = adaptation.get_detail_by_location([1], "city")
+        assert summary[0].adaptation == [10, 11]
+        assert detail[0].type == ["levee"]
+
+
+class TestStream:
+
+    def test_stream_csv_not_consumed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(firststreet.api.api, "STREAM_CHUNK_SIZE", 2)
+        probability = Probability(StubHttp(chance_response))
+        fsids = [1, 2, 3, 4, 5]
+
+        result = probability.get_chance(fsids, csv=True, output_dir=str(tmp_path), stream=True)
+        assert result is None
+
+        # Every chunk was written and appended without consuming anything
+        files = list(tmp_path.iterdir())
+        assert len(files) == 1
+        lines = files[0].read_text().splitlines()
+        assert len(lines) == len(fsids) + 1
+        assert sum(line.startswith("fsid") for line in lines) == 1
+        assert len(probability._http.requested) == len(fsids)
+
+    def test_stream_lazy(self, monkeypatch):
+        monkeypatch.setattr(firststreet.api.api, "STREAM_CHUNK_SIZE", 2)
+        probability = Probability(StubHttp(chance_response))
+
+        result = probability.get_chance([1, 2, 3, 4, 5], stream=True)
+        assert probability._http.requested == []
+        assert [chance.fsid for chance in result] == ["1", "2", "3", "4", "5"]
+
+    def test_stream_vectorized(self):
+        probability = Probability(StubHttp(chance_response))
+        with pytest.raises(InvalidArgument):
+            probability.get_chance([1, 2], stream=True, vectorized=True)
+
+    def test_stream_detail_cached(self, monkeypatch):
+        monkeypatch.setattr(firststreet.api.api, "STREAM_CHUNK_SIZE", 2)
+        adaptation = Adaptation(StubHttp(adaptation_response))
+        adaptation.get_detail([10, 11])
+
+        # Only the ids that are not cached are called, and the streamed ids are cached in turn
+        del adaptation._http.requested[:]
+        detail = list(adaptation.get_detail([10, 12, 11, 13], stream=True))
+        assert [d.adaptationId for d in detail] == ["10", "12", "11", "13"]
+        assert len(adaptation._http.requested) == 2
+        adaptation.get_detail([12, 13])
+        assert len(adaptation._http.requested) == 2
+
+
+class TestCsvWrites:
+
+    @staticmethod
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    def test_flush_raises(self, monkeypatch, caplog):
+        monkeypatch.setattr(firststreet.api.csv_format, "to_csv", self.fail)
+        probability = Probability(StubHttp(chance_response))
+
+        probability._to_csv([], "probability", "chance")
+        with pytest.raises(OSError):
+            probability.flush()
+
+        assert "disk full" in caplog.text
+        assert probability._pending_writes == []
+
+    def test_next_write_does_not_raise(self, monkeypatch):
+        monkeypatch.setattr(firststreet.api.csv_format, "to_csv", self.fail)
+        probability = Probability(StubHttp(chance_response))
+
+        probability._to_csv([], "probability", "chance")
+        probability._pending_writes[0].exception()
+        probability._to_csv([], "probability", "chance")
+
+        # The failed write is kept for flush to raise
+        assert len(probability._pending_writes) == 2
+        with pytest.raises(OSError):
+            probability.flush()
+
+    def test_finished_writes_dropped(self, tmp_path):
+        probability = Probability(StubHttp(chance_response))
+
+        probability.get_chance([1], csv=True, output_dir=str(tmp_path))
+        probability._pending_writes[0].result()
+        probability.get_chance([2], csv=True, output_dir=str(tmp_path))
+        assert len(probability._pending_writes) == 1
+        probability.flush()
+
+    def test_modify_after_return(self, tmp_path):
+        probability = Probability(StubHttp(chance_response))
+
+        chance = probability.get_chance([2, 1, 3], csv=True, output_dir=str(tmp_path))
+        chance.sort(key=lambda x: x.fsid)
+        chance.clear()
+        probability.flush()
+
+        lines = next(tmp_path.iterdir()).read_text().splitlines()
+        assert len(lines) == 4
+
+    def test_vectorized_stays_lazy(self, tmp_path):
+        probability = Probability(StubHttp(chance_response))
+
+        batch = probability.get_chance([1, 2, 3], csv=True, output_dir=str(tmp_path), vectorized=True)
+        probability.flush()
+
+        # The csv is written from the responses, without creating the objects of the returned batch
+        assert batch._products == [None, None, None]
+        lines = next(tmp_path.iterdir()).read_text().splitlines()
+        assert len(lines) == 4
+        assert batch[0] is batch[0]
@@ -4,6 +4,10 @@
 # External Imports
 import asyncio
 
+# Internal Imports
+import firststreet.http_util
+from firststreet.http_util import DEFAULT_CONNECTION_LIMIT, MAX_AUTO_CONNECTION_LIMIT, Http
+
 
 class TestNetworkErrors:
 
@@ -78,3 +82,34 @@ class TestNetworkErrors:
         response = loop.run_until_complete(setup_connection.endpoint_execute([endpoint]))
         assert len(response) == 1
         assert response[0]['search_item'] == "test_item"
+
+
+class TestConnectionLimit:
+
+    def test_fixed(self):
+        http = Http("", 7, 4950, 60)
+        http._record_rtt(10)
+        assert http.get_connection_limit() == 7
+
+    def test_auto_default(self, monkeypatch):
+        monkeypatch.setattr(firststreet.http_util, "_file_descriptor_limit", lambda: None)
+        http = Http("", None, 4950, 60)
+        assert http.get_connection_limit() == DEFAULT_CONNECTION_LIMIT
+
+    def test_auto_rtt(self, monkeypatch):
+        monkeypatch.setattr(firststreet.http_util, "_file_descriptor_limit", lambda: None)
+        http = Http("", None, 100, 1)
+        http._record_rtt(0.5)
+        assert http.get_connection_limit() == 50
+
+    def test_auto_max(self, monkeypatch):
+        monkeypatch.setattr(firststreet.http_util, "_file_descriptor_limit", lambda: None)
+        http = Http("", None, 20000, 1)
+        http._record_rtt(1)
+        assert http.get_connection_limit() == MAX_AUTO_CONNECTION_LIMIT
+
+    def test_auto_file_descriptors(self, monkeypatch):
+        monkeypatch.setattr(firststreet.http_util, "_file_descriptor_limit", lambda: 128)
+        http = Http("", None, 20000, 1)
+        http._record_rtt(1)
+        assert http.get_connection_limit() == 128
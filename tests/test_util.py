@@ -0,0 +1,66 @@
+# Author: Kelvin Lai <kelvin@firststreet.org>
+# Copyright: This module is owned by First Street Foundation
+
+# Internal Imports
+import firststreet.util
+from firststreet.util import ResponseCache
+
+
+class Clock:
+    """Replaces time.monotonic with a clock that only moves when told to"""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache:
+
+    def test_get_set(self):
+        cache = ResponseCache(2, 60)
+        cache.set(1, {"adaptationId": 1})
+        assert cache.get(1) == {"adaptationId": 1}
+        assert cache.get(2) is None
+
+    def test_evict_least_recently_used(self):
+        cache = ResponseCache(2, 60)
+        cache.set(1, {"adaptationId": 1})
+        cache.set(2, {"adaptationId": 2})
+
+        # Reading 1 makes 2 the least recently used
+        cache.get(1)
+        cache.set(3, {"adaptationId": 3})
+        assert len(cache) == 2
+        assert cache.get(2) is None
+        assert cache.get(1) == {"adaptationId": 1}
+        assert cache.get(3) == {"adaptationId": 3}
+
+    def test_expire(self, monkeypatch):
+        clock = Clock()
+        monkeypatch.setattr(firststreet.util.time, "monotonic", clock)
+        cache = ResponseCache(2, 60)
+        cache.set(1, {"adaptationId": 1})
+
+        clock.now = 60
+        assert cache.get(1) == {"adaptationId": 1}
+
+        clock.now = 61
+        assert cache.get(1) is None
+        assert len(cache) == 0
+
+    def test_copied(self):
+        cache = ResponseCache(2, 60)
+        response = {"adaptationId": 1, "type": ["levee"]}
+        cache.set(1, response)
+        response["type"].append("wall")
+        cache.get(1)["type"].append("pump")
+        assert cache.get(1) == {"adaptationId": 1, "type": ["levee"]}
+
+    def test_clear(self):
+        cache = ResponseCache(2, 60)
+        cache.set(1, {"adaptationId": 1})
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.get(1) is None